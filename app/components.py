@@ -1,9 +1,16 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from utils import (CACHE_MAX_ENTRIES, MAX_PLOT_POINTS, compute_correlation,
+                   downsample, get_units, hourly_stats)
+
+# Larger correlation matrices are drawn without per-cell text labels
+MAX_ANNOTATED_CORR_COLUMNS = 10
 
 def render_file_uploader():
     """Render file uploader component"""
@@ -95,10 +102,26 @@ def render_solar_scorecard(score_data, filename):
     fig.update_layout(title="Solar Potential Score Breakdown")
     st.plotly_chart(fig, use_container_width=True)
 
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _to_arrow(df):
+    """Convert the frame to an Arrow table once (tables are immutable, so it is shared), or None"""
+    try:
+        return pa.Table.from_pandas(df)
+    except (pa.ArrowTypeError, pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # e.g. object columns mixing str and float: st.dataframe(df) applies its own fixes
+        return None
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _null_counts(df):
+    """Per-column null counts from a single pass over the NA mask"""
+    return df.isna().sum()
+
 def render_data_overview(df, filename):
     """Render data overview section"""
     st.header("📊 Data Overview")
     
+    nulls_per_col = _null_counts(df)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -111,25 +134,54 @@ def render_data_overview(df, filename):
         st.metric("Date Range", f"{df.index.min().strftime('%Y-%m-%d')} to {df.index.max().strftime('%Y-%m-%d')}")
     
     with col4:
-        missing = df.isnull().sum().sum()
+        missing = int(nulls_per_col.sum())
         st.metric("Missing Values", f"{missing:,}")
     
     # Show dataframe
     with st.expander("View Raw Data"):
-        st.dataframe(df, use_container_width=True)
+        table = _to_arrow(df)
+        st.dataframe(df if table is None else table, use_container_width=True)
     
     # Column info
     with st.expander("Column Information"):
         col_info = pd.DataFrame({
             'Column': df.columns,
             'Data Type': df.dtypes,
-            'Non-Null Count': df.count(),
-            'Null Count': df.isnull().sum()
+            'Non-Null Count': len(df) - nulls_per_col,
+            'Null Count': nulls_per_col
         })
         st.dataframe(col_info, use_container_width=True)
 
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _correlation_figure_json(df, columns):
+    """Correlation heatmap for the selected columns, built once and kept as JSON"""
+    corr_matrix = compute_correlation(df, columns)
+    annotate = len(columns) <= MAX_ANNOTATED_CORR_COLUMNS
+    fig = px.imshow(corr_matrix, title="Correlation Matrix", text_auto='.2f' if annotate else False)
+    return fig.to_json()
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _hourly_mean(df, column):
+    """Mean of a column per hour of day, cached across reruns"""
+    hours, mean, _ = hourly_stats(df['Hour'], df[column])
+    return pd.Series(mean, index=pd.Index(hours, name='Hour'), name=column)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _downsample(df, x, y, n_points=MAX_PLOT_POINTS):
+    """Downsampled x/y data for plotting, cached across reruns"""
+    return downsample(df, x, y, n_points)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _sample_positions(n_rows, n_points=MAX_PLOT_POINTS):
+    """Fixed random sample of row positions, keyed on the row count only"""
+    if n_rows <= n_points:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(0)
+    return np.sort(rng.choice(n_rows, size=n_points, replace=False))
+
+@st.fragment
 def render_interactive_plots(df, filters):
-    """Render interactive visualization section"""
+    """Render interactive visualization section (reruns on its own as a fragment)"""
     st.header("📈 Interactive Analysis")
     
     # Plot type selector
@@ -140,8 +192,11 @@ def render_interactive_plots(df, filters):
     
     if plot_type == "Time Series":
         col = st.selectbox("Select Metric", filters['selected_columns'])
-        fig = px.line(df, y=col, title=f"{col} Time Series")
-        st.plotly_chart(fig, use_container_width=True)
+        if col is not None:
+            fig = px.line(_downsample(df, None, col), y=col, title=f"{col} Time Series")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("Select a metric to plot its time series")
     
     elif plot_type == "Distribution":
         col = st.selectbox("Select Metric", filters['selected_columns'])
@@ -150,8 +205,7 @@ def render_interactive_plots(df, filters):
     
     elif plot_type == "Correlation":
         if len(filters['selected_columns']) >= 2:
-            corr_matrix = df[filters['selected_columns']].corr()
-            fig = px.imshow(corr_matrix, title="Correlation Matrix")
+            fig = pio.from_json(_correlation_figure_json(df, tuple(filters['selected_columns'])))
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("Select at least 2 metrics for correlation analysis")
@@ -163,19 +217,22 @@ def render_interactive_plots(df, filters):
         with col2:
             y_axis = st.selectbox("Y-Axis", filters['selected_columns'])
         
-        fig = px.scatter(df, x=x_axis, y=y_axis, title=f"{y_axis} vs {x_axis}")
+        plot_df = df.iloc[_sample_positions(len(df))]
+        fig = px.scatter(plot_df, x=x_axis, y=y_axis, title=f"{y_axis} vs {x_axis}",
+                        render_mode="webgl")
         st.plotly_chart(fig, use_container_width=True)
     
     elif plot_type == "Daily Pattern":
         if 'GHI' in df.columns and 'Hour' in df.columns:
-            daily_avg = df.groupby('Hour')['GHI'].mean()
+            daily_avg = _hourly_mean(df, 'GHI')
             fig = px.line(x=daily_avg.index, y=daily_avg.values, 
                          title="Average Daily GHI Pattern")
             fig.update_layout(xaxis_title="Hour of Day", yaxis_title="GHI (W/m²)")
             st.plotly_chart(fig, use_container_width=True)
 
+@st.fragment
 def render_weather_impact(df):
-    """Render weather impact analysis"""
+    """Render weather impact analysis (reruns on its own as a fragment)"""
     if 'GHI' not in df.columns:
         return
     
@@ -188,9 +245,11 @@ def render_weather_impact(df):
     if available_weather:
         col = st.selectbox("Select Weather Variable", available_weather)
         
-        # Scatter plot with trendline
-        fig = px.scatter(df, x=col, y='GHI', 
+        # Scatter plot with trendline, fitted on a fixed sample of rows
+        plot_df = df.iloc[_sample_positions(len(df))]
+        fig = px.scatter(plot_df, x=col, y='GHI', 
                         trendline="lowess",
+                        render_mode="webgl",
                         title=f"GHI vs {col}",
                         labels={col: f"{col} ({get_units(col)})", 'GHI': 'GHI (W/m²)'})
         st.plotly_chart(fig, use_container_width=True)
@@ -198,14 +257,3 @@ def render_weather_impact(df):
         # Correlation value
         correlation = df['GHI'].corr(df[col])
         st.info(f"Correlation between GHI and {col}: **{correlation:.3f}**")
-
-def get_units(column_name):
-    """Return units for column names"""
-    units_map = {
-        'GHI': 'W/m²', 'DNI': 'W/m²', 'DHI': 'W/m²', 
-        'ModA': 'W/m²', 'ModB': 'W/m²',
-        'Tamb': '°C', 'TModA': '°C', 'TModB': '°C',
-        'RH': '%', 'WS': 'm/s', 'WSgust': 'm/s', 'BP': 'hPa',
-        'WD': '°N', 'Precipitation': 'mm/min'
-    }
-    return units_map.get(column_name, '')
\ No newline at end of file
@@ -1,7 +1,8 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils import load_data, create_solar_score
+from utils import load_data, create_solar_score, compute_column_means
 from components import (render_file_uploader, render_sidebar_filters, 
                        render_solar_scorecard, render_data_overview,
                        render_interactive_plots, render_weather_impact)
@@ -15,28 +16,10 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 3rem;
-        color: #FF6B00;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .sub-header {
-        font-size: 1.5rem;
-        color: #2E86AB;
-        margin-top: 2rem;
-        margin-bottom: 1rem;
-    }
-    .metric-card {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 5px solid #FF6B00;
-    }
-</style>
-""", unsafe_allow_html=True)
+with open(os.path.join(os.path.dirname(__file__), 'style.css'), encoding='utf-8') as f:
+    CUSTOM_CSS = f"<style>{f.read()}</style>"
+
+st.html(CUSTOM_CSS)
 
 def main():
     # Header
@@ -54,7 +37,7 @@ def main():
     
     if uploaded_file is not None:
         # Load and process data
-        df, message = load_data(uploaded_file)
+        df, message = load_data(uploaded_file.getvalue(), uploaded_file.name)
         
         if df is not None:
             st.success(f" {message}")
@@ -73,18 +56,19 @@ def main():
                 render_solar_scorecard(score_data, uploaded_file.name)
                 
                 # Quick stats
+                averages = compute_column_means(df, ('GHI', 'Tamb', 'RH', 'WS'))
                 col1, col2 = st.columns(2)
                 with col1:
-                    if 'GHI' in df.columns:
-                        st.metric("Average GHI", f"{df['GHI'].mean():.1f} W/m²")
-                    if 'Tamb' in df.columns:
-                        st.metric("Average Temperature", f"{df['Tamb'].mean():.1f} °C")
+                    if 'GHI' in averages:
+                        st.metric("Average GHI", f"{averages['GHI']:.1f} W/m²")
+                    if 'Tamb' in averages:
+                        st.metric("Average Temperature", f"{averages['Tamb']:.1f} °C")
                 
                 with col2:
-                    if 'RH' in df.columns:
-                        st.metric("Average Humidity", f"{df['RH'].mean():.1f} %")
-                    if 'WS' in df.columns:
-                        st.metric("Average Wind Speed", f"{df['WS'].mean():.1f} m/s")
+                    if 'RH' in averages:
+                        st.metric("Average Humidity", f"{averages['RH']:.1f} %")
+                    if 'WS' in averages:
+                        st.metric("Average Wind Speed", f"{averages['WS']:.1f} m/s")
             
             with tab2:
                 render_interactive_plots(df, filters)
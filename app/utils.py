@@ -1,33 +1,195 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+from types import MappingProxyType
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
 
-def load_data(uploaded_file):
-    """Load and preprocess uploaded CSV file"""
+# Measurement units by column name (read-only, built once at import)
+_UNITS_MAP = MappingProxyType({
+    'GHI': 'W/m²', 'DNI': 'W/m²', 'DHI': 'W/m²', 
+    'ModA': 'W/m²', 'ModB': 'W/m²',
+    'Tamb': '°C', 'TModA': '°C', 'TModB': '°C',
+    'RH': '%', 'WS': 'm/s', 'WSgust': 'm/s', 'BP': 'hPa',
+    'WD': '°N', 'Precipitation': 'mm/min'
+})
+
+# Upper bound on cached entries per function, so a long-running server holds only recent uploads
+CACHE_MAX_ENTRIES = 4
+
+# Time features added by load_data, excluded from correlation heatmaps
+TIME_FEATURE_COLUMNS = ('Hour', 'Month', 'DayOfWeek')
+
+# Columns with lower variance carry no correlation signal
+MIN_CORRELATION_VARIANCE = 1e-9
+
+# Number of bins for server-side histograms
+HISTOGRAM_BINS = 50
+
+# Series longer than this are downsampled before being sent to the browser
+MAX_PLOT_POINTS = 2000
+
+# Parsed-upload Parquet cache: private per-user directory holding the most recent files.
+# Bump PARQUET_CACHE_VERSION whenever _prepare_frame's output (dtypes, features) changes.
+PARQUET_CACHE_DIRNAME = 'solar-dashboard'
+PARQUET_CACHE_VERSION = 1
+PARQUET_CACHE_MAX_FILES = 16
+
+# Candidate timestamp column names, in order of preference
+TIMESTAMP_COLUMNS = ('Timestamp', 'timestamp', 'Date', 'date', 'Time', 'time')
+
+# Known sensor columns, read as float32 at parse time
+MEASUREMENT_COLUMNS = ('GHI', 'DNI', 'DHI', 'ModA', 'ModB', 'Tamb', 'TModA', 'TModB',
+                       'RH', 'WS', 'WSgust', 'BP', 'WD', 'Precipitation')
+
+def _read_csv(uploaded_file):
+    """Parse CSV with pyarrow, typing known measurement columns as float32 at parse time"""
     try:
-        df = pd.read_csv(uploaded_file)
-        
-        # Auto-detect timestamp column
-        timestamp_cols = ['Timestamp', 'timestamp', 'Date', 'date', 'Time', 'time']
-        for col in timestamp_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col])
-                df.set_index(col, inplace=True)
-                break
-        
-        # Create time-based features
-        df['Hour'] = df.index.hour
-        df['Month'] = df.index.month
-        df['DayOfWeek'] = df.index.dayofweek
+        # column_types makes the reader build float32 buffers directly (no float64 pass)
+        convert = pa_csv.ConvertOptions(column_types=dict.fromkeys(MEASUREMENT_COLUMNS, pa.float32()))
+        return pa_csv.read_csv(uploaded_file, convert_options=convert).to_pandas()
+    except pa.ArrowInvalid:
+        # A non-numeric reading in a known column: let every column's type be inferred
+        uploaded_file.seek(0)
+    try:
+        return pd.read_csv(uploaded_file, engine='pyarrow')
+    except ValueError:
+        # pyarrow is stricter than the C parser about this file (e.g. ragged rows)
+        uploaded_file.seek(0)
+        return pd.read_csv(uploaded_file, low_memory=False)
+
+def _parquet_cache_dir():
+    """Per-user cache directory, resolved on use ($XDG_CACHE_HOME, else ~/.cache)"""
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base or not os.path.isabs(base):
+        # Unset, empty or relative values are ignored, as the XDG spec requires
+        base = Path.home() / '.cache'
+    return Path(base) / PARQUET_CACHE_DIRNAME
+
+def _parquet_cache_path(file_bytes):
+    """Location of the parsed-data Parquet cache for these file contents, or None without a home"""
+    try:
+        cache_dir = _parquet_cache_dir()
+    except RuntimeError:
+        # No HOME and no passwd entry (e.g. a container under an arbitrary UID): skip the cache
+        return None
+    digest = hashlib.md5(file_bytes, usedforsecurity=False).hexdigest()
+    return cache_dir / f"v{PARQUET_CACHE_VERSION}_{digest}.parquet"
+
+def _read_parquet_cache(path):
+    """Return the cached frame, or None if there is no usable cache entry"""
+    if path is None or not path.exists():
+        return None
+    try:
+        df = pd.read_parquet(path)
+        path.touch()  # mark as recently used for pruning
+        return df
+    except Exception:
+        return None
+
+def _write_parquet_cache(df, path):
+    """Best-effort write of the parsed frame; a failed write only costs a re-parse"""
+    if path is None:
+        return
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        _prune_parquet_cache(path.parent)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+
+def _prune_parquet_cache(cache_dir):
+    """Keep only the PARQUET_CACHE_MAX_FILES most recently used cache files"""
+    files = sorted(cache_dir.glob('*.parquet'), key=lambda f: f.stat().st_mtime, reverse=True)
+    for stale in files[PARQUET_CACHE_MAX_FILES:]:
+        stale.unlink(missing_ok=True)
+
+def _time_features(index):
+    """Hour, month and day-of-week of a DatetimeIndex as int8 arrays (float32 with NaN for NaT)"""
+    if isinstance(index, pd.DatetimeIndex) and index.tz is None and not index.hasnans:
+        # Derive all three from the raw datetime64 buffer (1970-01-01 was a Thursday)
+        values = index.values
+        hour = values.astype('datetime64[h]').astype(np.int64) % 24
+        month = values.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        dayofweek = (values.astype('datetime64[D]').astype(np.int64) + 3) % 7
+        return hour.astype(np.int8), month.astype(np.int8), dayofweek.astype(np.int8)
+    
+    # Timezone-aware or NaT-containing indexes need the calendar-aware accessors
+    features = (index.hour, index.month, index.dayofweek)
+    if index.hasnans:
+        # NaT timestamps leave their features missing, so int8 cannot hold them
+        return tuple(np.asarray(f, dtype=np.float32) for f in features)
+    return tuple(np.asarray(f, dtype=np.int8) for f in features)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def load_data(file_bytes, name):
+    """Load and preprocess uploaded CSV file, cached on the file contents"""
+    try:
+        cache_path = _parquet_cache_path(file_bytes)
+        df = _read_parquet_cache(cache_path)
+        if df is None:
+            df = _prepare_frame(_read_csv(io.BytesIO(file_bytes)))
+            _write_parquet_cache(df, cache_path)
         
         return df, f"Successfully loaded {len(df)} rows with {len(df.columns)} columns"
     
     except Exception as e:
         return None, f"Error loading file: {str(e)}"
 
+def _prepare_frame(df):
+    """Index a freshly parsed frame by timestamp, add time features and compact dtypes"""
+    # Auto-detect timestamp column (first candidate present wins)
+    columns = set(df.columns)
+    col = next((c for c in TIMESTAMP_COLUMNS if c in columns), None)
+    if col is not None:
+        # The pyarrow engine already parses ISO timestamps while reading
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        df.set_index(col, inplace=True)
+    
+    # Create time-based features
+    df['Hour'], df['Month'], df['DayOfWeek'] = _time_features(df.index)
+    
+    # Compact dtypes: float32 measurements, categorical labels
+    float_cols = df.select_dtypes(include='float64').columns
+    df = df.astype({col: np.float32 for col in float_cols})
+    if 'Country' in df.columns:
+        df['Country'] = df['Country'].astype('category')
+    
+    return df
+
+def _quantile(values, q):
+    """Linearly interpolated quantile of a NaN-free array via np.partition (O(n) select)"""
+    if values.size == 0:
+        return np.nan
+    pos = q * (values.size - 1)
+    lo = int(pos)
+    hi = min(lo + 1, values.size - 1)
+    part = np.partition(values, (lo, hi))
+    return part[lo] + (part[hi] - part[lo]) * (pos - lo)
+
+def _ghi_stats(ghi):
+    """Mean, sample std and share of readings above the 0.7 quantile for a GHI series"""
+    # Fused sum / sum-of-squares pass; NaNs are skipped like pandas does
+    values = ghi.to_numpy(dtype=np.float64)
+    n_rows = values.size
+    values = values[~np.isnan(values)]
+    n = values.size
+    mean = values.sum() / n if n else np.nan
+    std = np.sqrt(max(np.dot(values, values) - n * mean * mean, 0) / (n - 1)) if n > 1 else np.nan
+    above_q70 = np.count_nonzero(values > _quantile(values, 0.7)) / n_rows * 100 if n_rows else np.nan
+    return {'mean': mean, 'std': std, 'above_q70': above_q70}
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
 def create_solar_score(df):
     """Calculate comprehensive solar potential score"""
     if 'GHI' not in df.columns:
@@ -35,24 +197,27 @@ def create_solar_score(df):
     
     scores = {}
     
+    ghi_stats = _ghi_stats(df['GHI'])
+    ghi_mean, ghi_std = ghi_stats['mean'], ghi_stats['std']
+    
     # Energy Potential (40%)
-    energy_score = df['GHI'].mean()
+    energy_score = ghi_mean
     scores['energy'] = energy_score
     
     # Consistency (30%) - lower variability is better
-    if df['GHI'].std() > 0:
-        consistency = (1 - (df['GHI'].std() / df['GHI'].mean())) * 100
+    if ghi_std > 0:
+        consistency = (1 - (ghi_std / ghi_mean)) * 100
         scores['consistency'] = max(consistency, 0)
     
     # Reliability (20%) - percentage of optimal hours
-    optimal_threshold = df['GHI'].quantile(0.7)
-    reliability = (df['GHI'] > optimal_threshold).mean() * 100
+    reliability = ghi_stats['above_q70']
     scores['reliability'] = reliability
     
     # Weather Resilience (10%)
     weather_score = 100
     if 'RH' in df.columns:
-        high_humidity = (df['RH'] > 85).mean() * 100
+        rh = df['RH'].to_numpy()
+        high_humidity = np.count_nonzero(rh > 85) / rh.size * 100
         weather_score -= high_humidity * 0.5
     
     scores['weather'] = max(weather_score, 0)
@@ -74,54 +239,176 @@ def create_solar_score(df):
         'raw_scores': scores
     }
 
+def hourly_stats(hours, values):
+    """Per-hour mean and sample std via np.bincount; NaN values are skipped.
+    
+    Returns (hours, mean, std) for the hours that have at least one value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    hours = np.asarray(hours, dtype=np.float64)
+    # Hours are NaN for rows whose timestamp did not parse
+    valid = ~(np.isnan(values) | np.isnan(hours))
+    hours = hours[valid].astype(np.int64)
+    values = values[valid]
+    
+    counts = np.bincount(hours, minlength=24)
+    sums = np.bincount(hours, weights=values, minlength=24)
+    sq_sums = np.bincount(hours, weights=values * values, minlength=24)
+    
+    observed = np.flatnonzero(counts)
+    n = counts[observed]
+    mean = sums[observed] / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = np.maximum(sq_sums[observed] - n * mean * mean, 0) / (n - 1)
+    std = np.where(n > 1, np.sqrt(var), np.nan)
+    return observed, mean, std
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def compute_column_means(df, columns):
+    """Means of whichever of columns are present, in one pass over the frame"""
+    present = [col for col in columns if col in df.columns]
+    return df[present].mean().to_dict()
+
+def compute_correlation(df, columns):
+    """Pearson correlation matrix for columns, computed with a single BLAS pass"""
+    columns = list(columns)
+    # One contiguous float32 row per column, filled straight from each column's buffer
+    block = np.empty((len(columns), len(df)), dtype=np.float32)
+    for row, col in zip(block, columns):
+        row[:] = df[col].to_numpy()
+    if np.isnan(block).any():
+        # np.corrcoef has no pairwise NaN handling; keep pandas semantics
+        return df[columns].corr()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.corrcoef(block, dtype=np.float32)
+    return pd.DataFrame(np.atleast_2d(corr), index=columns, columns=columns)
+
+def lttb_indices(x, y, n_out):
+    """Positions of the points kept by largest-triangle-three-buckets downsampling.
+    
+    x must be sorted ascending; the first and last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[stop:edges[i + 2]].mean()
+            next_y = y[stop:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        
+        # Twice the triangle area formed with the previous pick and the next bucket's mean
+        areas = np.abs((x[a] - next_x) * (y[start:stop] - y[a])
+                       - (x[a] - x[start:stop]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        keep[i + 1] = a
+    
+    return keep
+
+def _axis_values(axis):
+    """Plot axis (index or column) as float64 positions, NaN where missing"""
+    if pd.api.types.is_datetime64_any_dtype(axis):
+        # asi8 is the UTC epoch for tz-aware data too; NaT comes back as the int64 minimum
+        values = pd.DatetimeIndex(axis).asi8.astype(np.float64)
+        values[pd.isna(axis)] = np.nan
+        return values
+    return np.asarray(axis, dtype=np.float64)
+
+def downsample(df, x, y, n_points):
+    """Reduce df to the x/y columns and about n_points rows with LTTB (x=None uses the index).
+    
+    Rows missing y are dropped, except the first of each run, which keeps the gap visible.
+    """
+    if y is None:
+        raise ValueError("downsample needs a y column")
+    data = df[list(dict.fromkeys(c for c in (x, y) if c is not None))]
+    if len(data) <= n_points:
+        return data
+    
+    xs = _axis_values(data.index if x is None else data[x])
+    ys = data[y].to_numpy(dtype=np.float64)
+    
+    # Rows without an x position cannot be placed on the axis
+    order = np.argsort(xs, kind='stable')
+    order = order[~np.isnan(xs[order])]
+    missing = np.isnan(ys[order])
+    
+    valid = order[~missing]
+    keep = valid[lttb_indices(xs[valid], ys[valid], n_points)]
+    gap_starts = order[missing & ~np.concatenate(([False], missing[:-1]))]
+    
+    positions = np.concatenate((keep, gap_starts))
+    return data.iloc[positions[np.argsort(xs[positions], kind='stable')]]
+
 def create_ghi_distribution(df):
     """Create GHI distribution plot"""
-    fig = px.histogram(df, x='GHI', 
-                      title='Global Horizontal Irradiance Distribution',
-                      labels={'GHI': 'GHI (W/m²)'},
-                      color_discrete_sequence=['#FF6B00'])
-    fig.update_layout(showlegend=False)
+    # Bin server-side so only the bar heights are sent to the browser
+    ghi = df['GHI'].to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(ghi[~np.isnan(ghi)], bins=HISTOGRAM_BINS)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts,
+                           width=np.diff(edges), marker_color='#FF6B00'))
+    fig.update_layout(title='Global Horizontal Irradiance Distribution',
+                     xaxis_title='GHI (W/m²)', yaxis_title='count',
+                     bargap=0, showlegend=False)
     return fig
 
 def create_time_series(df, column):
     """Create interactive time series plot"""
-    fig = px.line(df, y=column, 
-                 title=f'{column} Time Series',
-                 labels={column: f'{column} ({get_units(column)})', 'index': 'Timestamp'})
-    fig.update_traces(line_width=1)
+    df = downsample(df, None, column, MAX_PLOT_POINTS)
+    # WebGL line trace: rasterized on the client GPU instead of one SVG path
+    fig = go.Figure(go.Scattergl(x=df.index, y=df[column].to_numpy(),
+                                 mode='lines', name=column, line=dict(width=1)))
+    fig.update_layout(title=f'{column} Time Series',
+                     xaxis_title='Timestamp',
+                     yaxis_title=f'{column} ({get_units(column)})')
     return fig
 
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
 def create_correlation_heatmap(df):
     """Create correlation heatmap for numeric columns"""
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    corr_matrix = df[numeric_cols].corr()
+    # Skip the derived time features and (near-)constant or empty columns
+    numeric_cols = [col for col, dtype in df.dtypes.items()
+                    if pd.api.types.is_numeric_dtype(dtype)
+                    and col not in TIME_FEATURE_COLUMNS
+                    and df[col].var() > MIN_CORRELATION_VARIANCE]
+    corr_matrix = compute_correlation(df, numeric_cols)
     
-    fig = px.imshow(corr_matrix, 
+    fig = px.imshow(corr_matrix.to_numpy(), x=numeric_cols, y=numeric_cols,
                    title='Correlation Matrix',
                    color_continuous_scale='RdBu_r',
                    aspect="auto")
     return fig
 
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
 def create_daily_pattern(df):
     """Create daily pattern visualization"""
     if 'GHI' in df.columns and 'Hour' in df.columns:
-        hourly_pattern = df.groupby('Hour')['GHI'].agg(['mean', 'std']).reset_index()
+        hours, mean, std = hourly_stats(df['Hour'], df['GHI'])
         
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=hourly_pattern['Hour'], y=hourly_pattern['mean'],
-                               mode='lines+markers', name='Average GHI',
-                               line=dict(color='#FF6B00', width=3)))
-        
-        fig.add_trace(go.Scatter(x=hourly_pattern['Hour'], 
-                               y=hourly_pattern['mean'] + hourly_pattern['std'],
-                               mode='lines', name='+1 STD',
-                               line=dict(color='gray', width=1, dash='dash')))
-        
-        fig.add_trace(go.Scatter(x=hourly_pattern['Hour'], 
-                               y=hourly_pattern['mean'] - hourly_pattern['std'],
-                               mode='lines', name='-1 STD',
-                               line=dict(color='gray', width=1, dash='dash'),
-                               fill='tonexty'))
+        fig = go.Figure(data=[
+            go.Scatter(x=hours, y=mean,
+                       mode='lines+markers', name='Average GHI',
+                       line=dict(color='#FF6B00', width=3)),
+            go.Scatter(x=hours, y=mean + std,
+                       mode='lines', name='+1 STD',
+                       line=dict(color='gray', width=1, dash='dash')),
+            go.Scatter(x=hours, y=mean - std,
+                       mode='lines', name='-1 STD',
+                       line=dict(color='gray', width=1, dash='dash'),
+                       fill='tonexty')
+        ])
         
         fig.update_layout(title='Daily Solar Pattern with Variability',
                          xaxis_title='Hour of Day',
@@ -131,11 +418,4 @@ def create_daily_pattern(df):
 
 def get_units(column_name):
     """Return units for column names"""
-    units_map = {
-        'GHI': 'W/m²', 'DNI': 'W/m²', 'DHI': 'W/m²', 
-        'ModA': 'W/m²', 'ModB': 'W/m²',
-        'Tamb': '°C', 'TModA': '°C', 'TModB': '°C',
-        'RH': '%', 'WS': 'm/s', 'WSgust': 'm/s', 'BP': 'hPa',
-        'WD': '°N', 'Precipitation': 'mm/min'
-    }
-    return units_map.get(column_name, '')
\ No newline at end of file
+    return _UNITS_MAP.get(column_name, '')
\ No newline at end of file
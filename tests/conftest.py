@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The dashboard modules import each other as top-level modules (streamlit run app/main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app'))
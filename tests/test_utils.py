@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+
+
+def test_lttb_indices_keeps_endpoints_and_peaks():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.zeros_like(x)
+    y[1234] = 50.0
+    keep = utils.lttb_indices(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 1234 in keep
+
+
+def test_lttb_indices_short_input_is_untouched():
+    assert np.array_equal(utils.lttb_indices(np.arange(5), np.arange(5), 10), np.arange(5))
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 10, 1001])
+@pytest.mark.parametrize('q', [0.0, 0.3, 0.7, 1.0])
+def test_quantile_matches_numpy(n, q):
+    values = np.random.default_rng(n).random(n)
+    assert utils._quantile(values, q) == pytest.approx(np.quantile(values, q))
+
+
+def test_quantile_of_empty_array_is_nan():
+    assert np.isnan(utils._quantile(np.array([]), 0.7))
+
+
+def test_time_features_match_pandas_accessors():
+    index = pd.DatetimeIndex(pd.date_range('1965-03-01', '2030-01-01', freq='37min')
+                             .values.astype('datetime64[s]'))
+    hour, month, dayofweek = utils._time_features(index)
+    assert hour.dtype == np.int8
+    assert np.array_equal(hour, index.hour)
+    assert np.array_equal(month, index.month)
+    assert np.array_equal(dayofweek, index.dayofweek)
+
+
+def test_time_features_tz_aware_index():
+    index = pd.date_range('2024-03-30', periods=100, freq='h', tz='Africa/Lagos')
+    hour, month, dayofweek = utils._time_features(index)
+    assert np.array_equal(hour, index.hour)
+    assert np.array_equal(dayofweek, index.dayofweek)
+
+
+def test_time_features_leave_nat_missing():
+    index = pd.DatetimeIndex(['2024-01-01 06:00', None, '2024-02-03 07:00'])
+    hour, month, dayofweek = utils._time_features(index)
+    assert np.isnan(hour[1]) and np.isnan(month[1]) and np.isnan(dayofweek[1])
+    assert list(hour[[0, 2]]) == [6, 7]
+    assert list(month[[0, 2]]) == [1, 2]
+
+
+def test_hourly_stats_matches_groupby():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Hour': rng.integers(3, 20, 5000), 'GHI': rng.random(5000) * 900})
+    df.loc[4, 'GHI'] = np.nan
+    df.loc[len(df)] = {'Hour': 22, 'GHI': 5.0}
+    hours, mean, std = utils.hourly_stats(df['Hour'], df['GHI'])
+    expected = df.groupby('Hour')['GHI'].agg(['mean', 'std'])
+    assert np.array_equal(hours, expected.index)
+    np.testing.assert_allclose(mean, expected['mean'])
+    np.testing.assert_allclose(std, expected['std'])
+
+
+def test_hourly_stats_skips_missing_hours():
+    hours, mean, _ = utils.hourly_stats(np.array([6.0, np.nan, 7.0]), np.array([1.0, 2.0, 4.0]))
+    assert list(hours) == [6, 7]
+    assert list(mean) == [1.0, 4.0]
+
+
+def test_downsample_tz_aware_index():
+    index = pd.date_range('2024-01-01', periods=10_000, freq='min', tz='UTC')
+    df = pd.DataFrame({'GHI': np.random.default_rng(1).random(10_000)}, index=index)
+    result = utils.downsample(df, None, 'GHI', 2000)
+    assert len(result) == 2000
+    assert result.index.is_monotonic_increasing
+
+
+def test_downsample_keeps_gaps():
+    index = pd.date_range('2024-01-01', periods=10_000, freq='min')
+    df = pd.DataFrame({'GHI': np.random.default_rng(2).random(10_000)}, index=index)
+    df.iloc[100:200, 0] = np.nan
+    result = utils.downsample(df, None, 'GHI', 2000)
+    assert result['GHI'].isna().sum() == 1
+
+    short = df.iloc[90:110]
+    assert utils.downsample(short, None, 'GHI', 2000)['GHI'].isna().sum() == 10
+
+
+def test_downsample_requires_y():
+    df = pd.DataFrame({'GHI': np.arange(5000.0)})
+    with pytest.raises(ValueError):
+        utils.downsample(df, None, None, 2000)
+
+
+def test_load_data_with_blank_timestamp(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    csv = b'Timestamp,GHI,RH\n2024-01-01 06:00,1.5,40\n,2.5,30\n2024-01-01 07:00,4,50\n'
+    df, message = utils.load_data.__wrapped__(csv, 'blank.csv')
+    assert df is not None, message
+    assert df['GHI'].dtype == np.float32
+    assert np.isnan(df['Hour'].iloc[1])
+    assert utils.create_daily_pattern.__wrapped__(df) is not None
+
+
+def test_load_data_without_home_directory(monkeypatch):
+    def no_home():
+        raise RuntimeError('Could not determine home directory.')
+
+    monkeypatch.delenv('XDG_CACHE_HOME', raising=False)
+    monkeypatch.setattr(utils.Path, 'home', no_home)
+    csv = b'Timestamp,GHI\n2024-01-01 06:00,1.5\n2024-01-01 07:00,4\n'
+    df, message = utils.load_data.__wrapped__(csv, 'nohome.csv')
+    assert df is not None, message
+    assert len(df) == 2
+
+
+def test_parquet_cache_ignores_empty_or_relative_xdg_cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', '')
+    monkeypatch.setattr(utils.Path, 'home', lambda: tmp_path)
+    assert utils._parquet_cache_dir() == tmp_path / '.cache' / utils.PARQUET_CACHE_DIRNAME
+    monkeypatch.setenv('XDG_CACHE_HOME', 'relative')
+    assert utils._parquet_cache_dir() == tmp_path / '.cache' / utils.PARQUET_CACHE_DIRNAME